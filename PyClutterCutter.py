@@ -3,14 +3,18 @@
 import os
 import ast
 import sys
+import re
 import fnmatch
 import shutil
+import hashlib
+import functools
+import json
+import mmap
 import importlib.util
-import yaml
 import argparse
+import contextlib
 from pathlib import Path
-from datetime import datetime
-import multiprocessing
+import time
 import tty
 import termios
 
@@ -23,6 +27,11 @@ if sys.version_info < REQUIRED_PYTHON_VERSION:
 
 print(f"Running PyClutterCutter with Python {'.'.join(map(str, sys.version_info[:3]))}")
 
+# Bump whenever the cached import extraction changes shape or meaning
+CACHE_VERSION = 4
+# Per-user cache root; nothing is ever written inside the scanned project
+CACHE_ROOT = os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'), 'pyclutter')
+
 # Configuration options
 DEFAULT_CONFIG = {
     'MAIN_FILE': 'app.py',
@@ -30,20 +39,37 @@ DEFAULT_CONFIG = {
     'EXTENSIONS': {'.py'},
     'SIZE_THRESHOLD': 1024 * 1024,
     'EXCLUDE_SELF': True,
-    'ARCHIVE_FOLDER': 'Guido_Gallery',
-    'USE_PARALLEL': True,
-    'MAX_THREADS': 4
+    'ARCHIVE_FOLDER': 'Guido_Gallery'
 }
 
 def load_config():
+    toml_path = Path('config.toml')
+    if toml_path.exists():
+        try:
+            import tomllib
+        except ImportError:
+            try:
+                import tomli as tomllib
+            except ImportError:
+                tomllib = None
+        if tomllib is not None:
+            with open(toml_path, 'rb') as config_file:
+                return {**DEFAULT_CONFIG, **tomllib.load(config_file)}
+        print("Warning: config.toml found but it needs Python 3.11+ or the 'tomli' package; ignoring it.")
+
     config_path = Path('config.yml')
     if config_path.exists():
+        # PyYAML is slow to import, so only pay for it when there is a file to read
+        import yaml
         with open(config_path, 'r') as config_file:
-            return {**DEFAULT_CONFIG, **yaml.safe_load(config_file)}
+            return {**DEFAULT_CONFIG, **(yaml.safe_load(config_file) or {})}
     return DEFAULT_CONFIG
 
 CONFIG = load_config()
 
+# str.endswith accepts a tuple and checks it in C
+EXTENSIONS = tuple(sorted(CONFIG['EXTENSIONS']))
+
 def parse_gitignore(directory):
     gitignore_path = Path(directory) / '.gitignore'
     ignore_patterns = set()
@@ -55,23 +81,78 @@ def parse_gitignore(directory):
                     ignore_patterns.add(line)
     return ignore_patterns
 
-def should_ignore(file_path, ignore_patterns, standard_ignores):
-    relative_path = os.path.relpath(file_path, start=os.getcwd())
-
-    for ignore in standard_ignores:
-        if relative_path.startswith(ignore):
-            return True
-
+def get_ignored_dir_names(ignore_patterns):
+    dir_names = set(CONFIG['IGNORE_DIRS'])
     for pattern in ignore_patterns:
-        if fnmatch.fnmatch(relative_path, pattern):
-            return True
-
-    return False
-
-def get_imported_modules(file_path):
-    with open(file_path, 'r') as file:
-        tree = ast.parse(file.read())
-
+        name = pattern.rstrip('/')
+        if name and not name.startswith('!') and '/' not in name and not any(c in name for c in '*?['):
+            dir_names.add(name)
+    return dir_names
+
+def compile_ignore_patterns(ignore_patterns):
+    if not ignore_patterns:
+        return None
+    return re.compile('|'.join(fnmatch.translate(os.path.normcase(pattern)) for pattern in sorted(ignore_patterns)))
+
+def should_ignore(file_path, ignore_re, root_len):
+    if ignore_re is None:
+        return False
+    relative_path = file_path[root_len:].lstrip(os.sep)
+    return ignore_re.match(os.path.normcase(relative_path)) is not None
+
+def get_cache_dir(directory):
+    project_key = hashlib.sha256(os.path.abspath(directory).encode('utf-8')).hexdigest()[:16]
+    return os.path.join(CACHE_ROOT, project_key)
+
+def get_cache_path(source, cache_dir):
+    key = hashlib.sha256(source).hexdigest()
+    py_version = f"{sys.version_info[0]}{sys.version_info[1]}"
+    return os.path.join(cache_dir, f"{key}-py{py_version}-v{CACHE_VERSION}.json")
+
+# The cache lives inside the scanned project, so it is stored as plain JSON
+# rather than pickle; a planted cache file must never be able to run code.
+def load_cached_imports(cache_path):
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as cache_file:
+            imports = json.load(cache_file)
+    except (OSError, ValueError, TypeError):
+        return None
+    if not isinstance(imports, list) or not all(isinstance(name, str) for name in imports):
+        return None
+    return set(imports)
+
+def save_cached_imports(cache_path, imports):
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(cache_path, 'w', encoding='utf-8') as cache_file:
+            json.dump(sorted(imports), cache_file)
+    except OSError:
+        pass
+
+@contextlib.contextmanager
+def map_source(file_path):
+    with open(file_path, 'rb') as file:
+        # Zero-length files cannot be mapped
+        if os.fstat(file.fileno()).st_size == 0:
+            yield b''
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as source:
+            yield source
+
+def get_imported_modules(file_path, cache_dir):
+    # hashlib and compile() both accept the mapping as a buffer, so a cache
+    # hit never copies the source into a Python bytes object.
+    with map_source(file_path) as source:
+        cache_path = get_cache_path(source, cache_dir)
+        imports = load_cached_imports(cache_path)
+        if imports is not None:
+            return imports
+
+        tree = compile(source, file_path, 'exec', flags=ast.PyCF_ONLY_AST, dont_inherit=True, optimize=2)
+
+    # Walk the whole tree: imports inside functions (app factories, lazy
+    # imports in main()) are real dependencies, and the cache above already
+    # spares repeat runs the parse and walk.
     imports = set()
     for node in ast.walk(tree):
         if isinstance(node, ast.Import):
@@ -82,114 +163,240 @@ def get_imported_modules(file_path):
             for alias in node.names:
                 imports.add(f"{module}.{alias.name}")
 
+    save_cached_imports(cache_path, imports)
     return imports
 
-def get_file_info(file_path):
-    stat = os.stat(file_path)
+def get_file_info(stat):
     return {
         'size': stat.st_size,
-        'created': datetime.fromtimestamp(stat.st_ctime).strftime('%Y-%m-%d %H:%M:%S'),
-        'modified': datetime.fromtimestamp(stat.st_mtime).strftime('%Y-%m-%d %H:%M:%S')
+        'created': stat.st_ctime,
+        'modified': stat.st_mtime
     }
 
+SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB')
+
 def format_size(size):
-    for unit in ['B', 'KB', 'MB', 'GB']:
-        if size < 1024.0:
-            return f"{size:.2f} {unit}"
-        size /= 1024.0
-    return f"{size:.2f} TB"
-
-def format_date(date_str):
-    date_obj = datetime.strptime(date_str, '%Y-%m-%d %H:%M:%S')
-    today = datetime.now().date()
-    if date_obj.date() == today:
-        return date_obj.strftime('%I:%M %p')
+    index = min(max(0, (int(size).bit_length() - 1) // 10), len(SIZE_UNITS) - 1)
+    return f"{size / (1 << (10 * index)):.2f} {SIZE_UNITS[index]}"
+
+_today = None
+
+def local_day(local_time):
+    return local_time.tm_year, local_time.tm_yday
+
+def format_date(timestamp):
+    local_time = time.localtime(timestamp)
+    today = _today or local_day(time.localtime())
+    if local_day(local_time) == today:
+        return time.strftime('%I:%M %p', local_time)
     else:
-        return date_obj.strftime('%A, %b %d, %Y')
+        return time.strftime('%A, %b %d, %Y', local_time)
 
 def print_table(title, headers, rows, widths):
-    def print_row(columns, widths):
-        return "│ " + " │ ".join(f"{col:<{width}}" for col, width in zip(columns, widths)) + " │"
-
-    def print_separator(widths, corner_left, corner_right, intersection, horizontal='─'):
+    def print_separator(corner_left, corner_right, intersection, horizontal='─'):
         return corner_left + intersection.join(horizontal * (w + 2) for w in widths) + corner_right
 
-    total_width = sum(widths) + len(widths) * 3 + 1
-    print(f"\n{title}:")
-    print(print_separator(widths, '┌', '┐', '┬'))
-    print(print_row(headers, widths))
-    print(print_separator(widths, '├', '┤', '┼'))
-    for row in rows:
-        print(print_row(row, widths))
-    print(print_separator(widths, '└', '┘', '┴'))
-
-def get_char():
+    row_format = "│ " + " │ ".join(f"{{:<{width}}}" for width in widths) + " │"
+    lines = [
+        f"\n{title}:",
+        print_separator('┌', '┐', '┬'),
+        row_format.format(*headers),
+        print_separator('├', '┤', '┼'),
+        *(row_format.format(*row) for row in rows),
+        print_separator('└', '┘', '┴'),
+    ]
+    sys.stdout.write("\n".join(lines) + "\n")
+
+@contextlib.contextmanager
+def raw_terminal():
     fd = sys.stdin.fileno()
     old_settings = termios.tcgetattr(fd)
     try:
-        tty.setraw(sys.stdin.fileno())
-        ch = sys.stdin.read(1)
+        tty.setraw(fd)
+        yield
     finally:
         termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
-    return ch
+
+# CSI (ESC [ params final) and SS3 (ESC O x) sequences, plus any prefix of
+# one that still needs more bytes.
+ESCAPE_SEQUENCE = re.compile(rb'\x1b(?:\[[\x20-\x3f]*[\x40-\x7e]|O.)', re.DOTALL)
+PARTIAL_ESCAPE = re.compile(rb'\x1b(?:\[[\x20-\x3f]*|O)?')
+
+def read_keys(fd):
+    # Bytes are buffered across reads so an escape sequence split between two
+    # os.read calls is reassembled rather than its tail being dispatched as
+    # ordinary keys. A bare ESC has no action, so waiting for the byte after
+    # it never stalls the menu: if that byte does not continue a sequence,
+    # ESC is yielded alone and the byte is handled normally.
+    buffer = b''
+    while True:
+        if not buffer or PARTIAL_ESCAPE.fullmatch(buffer):
+            data = os.read(fd, 32)
+            if not data:
+                raise EOFError
+            buffer += data
+            continue
+
+        match = ESCAPE_SEQUENCE.match(buffer)
+        if match:
+            key = match.group()
+        elif buffer.startswith(b'\x1b'):
+            prefix = PARTIAL_ESCAPE.match(buffer).group()
+            # Either a bare ESC, or a malformed sequence swallowed up to the
+            # offending byte
+            key = prefix if prefix == b'\x1b' else buffer[:len(prefix) + 1]
+        else:
+            key = buffer[:1]
+        buffer = buffer[len(key):]
+        yield key
 
 def interactive_select(options):
     selected = [False] * len(options)
     current = 0
 
+    # Only a window of rows that fits the terminal is drawn (header, blank
+    # line, status line and the cursor line take 8), and each row is clipped
+    # to the width so nothing wraps; relative cursor moves stay exact.
+    terminal = shutil.get_terminal_size()
+    visible = max(1, min(len(options), terminal.lines - 8))
+    top = 0
+
+    def format_option(i):
+        prefix = '> ' if i == current else '  '
+        checkbox = '[x]' if selected[i] else '[ ]'
+        return f"{prefix}{checkbox} {options[i]}"[:max(1, terminal.columns - 1)]
+
+    def format_status():
+        status = f"Selected files: {sum(selected)}"
+        if visible < len(options):
+            status += f" (showing {top + 1}-{top + visible} of {len(options)})"
+        return status
+
     def print_menu():
         menu = "\n" + "=" * 50 + "\n"
         menu += "Use ↑ and ↓ to move, SPACE to select/deselect, 'a' to select all, 'n' to deselect all\n"
         menu += "'q' to quit, 'd' to delete selected, 'm' to move selected to archive\n"
         menu += "=" * 50 + "\n"
-        for i, option in enumerate(options):
-            prefix = '> ' if i == current else '  '
-            checkbox = '[x]' if selected[i] else '[ ]'
-            menu += f"{prefix}{checkbox} {option}\n"
-        menu += f"\nSelected files: {sum(selected)}"
-        return menu
-
-    def clear_previous_menu(lines):
-        print(f"\033[{lines}A\033[J", end="")
+        menu += "\n".join(format_option(i) for i in range(top, top + visible))
+        menu += f"\n\n{format_status()}\n"
+        sys.stdout.write(menu)
+        sys.stdout.flush()
+
+    # The cursor rests on the line below the status line, so option i sits
+    # visible - (i - top) + 2 lines above it; only the rows that changed are
+    # redrawn, unless the window has to scroll to keep current in view.
+    def redraw(rows, status=False):
+        nonlocal top
+        if not top <= current < top + visible:
+            top = current if current < top else current - visible + 1
+            rows, status = range(top, top + visible), True
+        output = []
+        for i in rows:
+            if top <= i < top + visible:
+                offset = visible - (i - top) + 2
+                output.append(f"\033[{offset}A\r{format_option(i)}\033[K\033[{offset}B\r")
+        if status:
+            output.append(f"\033[1A\r{format_status()}\033[K\033[1B\r")
+        sys.stdout.write("".join(output))
+        sys.stdout.flush()
+
+    def move(step):
+        nonlocal current
+        if 0 <= current + step < len(options):
+            current += step
+            redraw((current - step, current))
+
+    def toggle():
+        selected[current] = not selected[current]
+        redraw((current,), status=True)
+
+    def set_all(value):
+        nonlocal selected
+        selected = [value] * len(options)
+        redraw(range(top, top + visible), status=True)
+
+    def finish(action):
+        nonlocal result
+        if action is not None:
+            result = [options[i] for i in range(len(options)) if selected[i]], action
+        return True
+
+    result = None
+    actions = {
+        b'\x1b[A': lambda: move(-1),  # Up arrow
+        b'\x1b[B': lambda: move(1),  # Down arrow
+        b'\x1bOA': lambda: move(-1),  # Up arrow, application cursor mode
+        b'\x1bOB': lambda: move(1),  # Down arrow, application cursor mode
+        b' ': toggle,
+        b'a': lambda: set_all(True),
+        b'n': lambda: set_all(False),
+        b'q': lambda: finish(None),
+        b'\x03': lambda: finish(None),  # Ctrl-C, which raw mode no longer turns into SIGINT
+        b'd': lambda: finish('delete'),
+        b'm': lambda: finish('archive'),
+    }
+    for key in (b'a', b'n', b'q', b'd', b'm'):
+        actions[key.upper()] = actions[key]
 
-    menu = print_menu()
-    print(menu)
-    lines = menu.count('\n') + 1
+    print_menu()
 
-    while True:
-        key = get_char()
-        if key == '\x1b':
-            key += get_char() + get_char()
-            if key == '\x1b[A' and current > 0:  # Up arrow
-                current -= 1
-            elif key == '\x1b[B' and current < len(options) - 1:  # Down arrow
-                current += 1
-        elif key == ' ':  # Space bar
-            selected[current] = not selected[current]
-        elif key.lower() == 'a':  # Select all
-            selected = [True] * len(options)
-        elif key.lower() == 'n':  # Deselect all
-            selected = [False] * len(options)
-        elif key.lower() == 'q':  # Quit
+    # Raw mode is entered once for the whole session; redraws avoid bare
+    # newlines so they render correctly without output post-processing.
+    fd = sys.stdin.fileno()
+    with raw_terminal():
+        try:
+            for key in read_keys(fd):
+                handler = actions.get(key)
+                if handler is not None and handler():
+                    return result
+        except EOFError:
+            # stdin closed mid-menu: treat it like 'q'
             return None
-        elif key.lower() == 'd':  # Delete
-            return [options[i] for i in range(len(options)) if selected[i]], 'delete'
-        elif key.lower() == 'm':  # Move to archive
-            return [options[i] for i in range(len(options)) if selected[i]], 'archive'
-
-        clear_previous_menu(lines)
-        menu = print_menu()
-        print(menu)
-        lines = menu.count('\n') + 1
-
-def process_file(args):
-    file_path, ignore_patterns, standard_ignores, main_file = args
-    if (not should_ignore(file_path, ignore_patterns, standard_ignores) and
-        any(file_path.endswith(ext) for ext in CONFIG['EXTENSIONS'])):
-        file_info = get_file_info(file_path)
-        is_main = os.path.basename(file_path) == main_file
-        return file_path, file_info, is_main
-    return None
+
+def _scandir_scan(directory, ignored_dirs, skip):
+    # Unreadable directories are skipped, as os.walk and os.fwalk do
+    try:
+        entries = os.scandir(directory)
+    except OSError:
+        return
+    with entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name not in ignored_dirs:
+                    yield from _scandir_scan(entry.path, ignored_dirs, skip)
+            elif entry.name.endswith(EXTENSIONS) and not skip(entry.path):
+                yield entry.path, entry.stat(follow_symlinks=False)
+
+def _scan(directory, ignored_dirs, skip):
+    # Yields (path, stat_result) for candidate files; skip(path) is consulted
+    # first so filtered files never cost a stat. fwalk keeps a descriptor per
+    # directory so each stat is a short dir_fd-relative lookup (done here,
+    # while root_fd is still open); it is unavailable on Windows.
+    if not hasattr(os, 'fwalk'):
+        yield from _scandir_scan(directory, ignored_dirs, skip)
+        return
+
+    for root, dirs, files, root_fd in os.fwalk(directory):
+        dirs[:] = [d for d in dirs if d not in ignored_dirs]
+        for name in files:
+            if name.endswith(EXTENSIONS):
+                file_path = os.path.join(root, name)
+                if not skip(file_path):
+                    yield file_path, os.stat(name, dir_fd=root_fd, follow_symlinks=False)
+
+@functools.lru_cache(maxsize=None)
+def _find_spec(top_level_name):
+    return importlib.util.find_spec(top_level_name)
+
+def resolve_import(top_level_name):
+    try:
+        return _find_spec(top_level_name), None
+    except (ImportError, AttributeError, ModuleNotFoundError) as e:
+        return None, e
+
+def resolve_imports(import_names):
+    top_level_names = {import_name.split('.')[0] for import_name in import_names}
+    return {name: resolve_import(name) for name in top_level_names}
 
 def find_unused_files(directory):
     used_files = set()
@@ -198,44 +405,43 @@ def find_unused_files(directory):
     large_files = set()
 
     ignore_patterns = parse_gitignore(directory)
+    ignored_dirs = get_ignored_dir_names(ignore_patterns)
+    ignore_re = compile_ignore_patterns(ignore_patterns)
+    root_len = len(directory)
+    cache_dir = get_cache_dir(directory)
     current_script = os.path.abspath(__file__)
 
-    file_list = []
-    for root, _, files in os.walk(directory):
-        for file in files:
-            file_path = os.path.join(root, file)
-            if not (CONFIG['EXCLUDE_SELF'] and file_path == current_script):
-                file_list.append((file_path, ignore_patterns, CONFIG['IGNORE_DIRS'], CONFIG['MAIN_FILE']))
+    def skip(file_path):
+        if CONFIG['EXCLUDE_SELF'] and file_path == current_script:
+            return True
+        return should_ignore(file_path, ignore_re, root_len)
 
-    if CONFIG['USE_PARALLEL']:
-        with multiprocessing.Pool(CONFIG['MAX_THREADS']) as pool:
-            results = pool.map(process_file, file_list)
-    else:
-        results = map(process_file, file_list)
-
-    for result in results:
-        if result:
-            file_path, file_info, is_main = result
-            all_files[file_path] = file_info
-
-            if file_info['size'] > CONFIG['SIZE_THRESHOLD']:
-                large_files.add(file_path)
-
-            if is_main:
-                used_files.add(file_path)
-                try:
-                    imports = get_imported_modules(file_path)
-                    for import_name in imports:
-                        try:
-                            spec = importlib.util.find_spec(import_name.split('.')[0])
-                            if spec and spec.origin:
-                                used_files.add(spec.origin)
-                        except (ImportError, AttributeError, ModuleNotFoundError) as e:
-                            problematic_imports.add((import_name, str(e)))
-                except Exception as e:
-                    print(f"Error processing {file_path}: {str(e)}")
-
-    unused_files = set(all_files.keys()) - used_files
+    main_files = []
+    for file_path, stat in _scan(directory, ignored_dirs, skip):
+        file_info = get_file_info(stat)
+        all_files[file_path] = file_info
+
+        if file_info['size'] > CONFIG['SIZE_THRESHOLD']:
+            large_files.add(file_path)
+
+        if os.path.basename(file_path) == CONFIG['MAIN_FILE']:
+            main_files.append(file_path)
+
+    for file_path in main_files:
+        used_files.add(file_path)
+        try:
+            imports = get_imported_modules(file_path, cache_dir)
+            resolved = resolve_imports(imports)
+            for import_name in imports:
+                spec, error = resolved[import_name.split('.')[0]]
+                if error is not None:
+                    problematic_imports.add((import_name, str(error)))
+                elif spec and spec.origin:
+                    used_files.add(spec.origin)
+        except Exception as e:
+            print(f"Error processing {file_path}: {str(e)}")
+
+    unused_files = all_files.keys() - used_files
     return unused_files, problematic_imports, large_files, all_files
 
 def delete_files(files_to_delete):
@@ -263,7 +469,9 @@ def parse_arguments():
     return parser.parse_args()
 
 def main():
+    global _today
     args = parse_arguments()
+    _today = local_day(time.localtime())
     app_directory = os.path.abspath(".")
     archive_path = os.path.join(app_directory, CONFIG['ARCHIVE_FOLDER'])
 